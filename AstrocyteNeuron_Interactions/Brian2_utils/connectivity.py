@@ -4,6 +4,7 @@ defined by Brian2 simulator
 """
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from brian2 import *
 
 def connectivity_plot(Syn, name='Source_to_Target', source='Source', target='Target', 
@@ -46,8 +47,12 @@ def connectivity_plot(Syn, name='Source_to_Target', source='Source', target='Tar
 
     ax1.scatter(np.zeros(Ns), np.arange(Ns), marker='o',s=size,  color=color_s) 
     ax1.scatter(np.ones(Nt), np.arange(Nt), marker='o', s=size, color=color_t)
-    for i,j in zip(Syn.i,Syn.j):
-        ax1.plot([0,1], [i,j], lw=lw, color=color_s)
+    # all synapses drawn as a single collection of segments (0,i)-(1,j)
+    i = np.asarray(Syn.i[:])
+    j = np.asarray(Syn.j[:])
+    segments = np.stack([np.column_stack([np.zeros_like(i), i]),
+                         np.column_stack([np.ones_like(j), j])], axis=1)
+    ax1.add_collection(LineCollection(segments, linewidths=lw, colors=color_s))
     ax1.set_xticks([0,1])
     ax1.set_xticklabels([source, target])
     ax1.set_ylabel('cell index')
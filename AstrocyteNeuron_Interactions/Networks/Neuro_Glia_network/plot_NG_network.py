@@ -12,8 +12,13 @@ import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import signal
+from scipy.ndimage import gaussian_filter1d, uniform_filter1d
 from brian2 import *
 from network_analysis import transient, selected_window
+try:
+	from numba import njit
+except ImportError:
+	njit = None
 
 
 def smoothing_b(x, window='gaussian', width=None, ddt=defaultclock.dt):
@@ -53,24 +58,19 @@ def smoothing_b(x, window='gaussian', width=None, ddt=defaultclock.dt):
 		and can be plotted against the same time 't'.
 	"""
 	if window == 'gaussian':
-		width_dt = int(np.round(2*width / ddt))
-		# Rounding only for the size of the window, not for the standard
-		# deviation of the Gaussian
-		window = np.exp(-np.arange(-width_dt,
-								width_dt + 1)**2 *
-						1. / (2 * (width/ddt) ** 2))
+		# truncate=2.0 rounds only the size of the window (2*width on each
+		# side), not the standard deviation of the Gaussian
+		return gaussian_filter1d(x, sigma=float(width/ddt), mode='nearest', truncate=2.0)
 	elif window == 'flat':
 		width_dt = int(width / 2 / ddt)*2 + 1
 		used_width = width_dt * ddt
 		if abs(used_width - width) > 1e-6*ddt:
 			logger.info(f'width adjusted from {width} to {used_width}',
 						'adjusted_width', once=True)
-		window = np.ones(width_dt)
+		return uniform_filter1d(x, size=width_dt, mode='nearest')
 	else:
 		raise NotImplementedError(f'Unknown pre-defined window "{window}"')
 
-	return np.convolve(x, window * 1. / sum(window), mode='same')
-
 def neurons_firing(t_spikes, neurons_i, time_start, time_stop):
     """
     Firing rate of single neurons
@@ -80,7 +80,7 @@ def neurons_firing(t_spikes, neurons_i, time_start, time_stop):
     ----------
     t_spikes : array
             spiking time of all neurons (comes from SpikesMonitor group of Brian2),
-            there are expressed in second. For istance:
+            there are expressed in second and sorted in time. For istance:
             monitor = SpikesMonitor(neurons)
             t_spikes = monitor.t
 
@@ -104,13 +104,16 @@ def neurons_firing(t_spikes, neurons_i, time_start, time_stop):
     # indeces: indeces of firing neurons
     indeces = np.unique(neurons_i)
     time = (time_stop-time_start)*second
+    if indeces.size == 0:
+        return np.zeros(0)/time
 
-    neurons_fr = []
-    for ind in indeces:
-        spikes = [spk for spk in t_spikes[neurons_i==ind] if (spk > time_start and spk < time_stop)]
-        firing_rate = len(spikes)/time
-        neurons_fr.append(firing_rate)
+    # spikes are recorded in time order: the window is a contiguous slice
+    # found by binary search, then counted per neuron in a single pass
+    start = np.searchsorted(t_spikes, time_start, side='right')
+    stop = np.searchsorted(t_spikes, time_stop, side='left')
+    counts = np.bincount(neurons_i[start:stop], minlength=indeces.max()+1)
 
+    neurons_fr = counts[indeces]/time
     return neurons_fr
 
 def variance(x):
@@ -128,12 +131,8 @@ def variance(x):
 	var : float
 		variance
 	"""
-	x = np.array(x)
-	N = len(x)
-
-	mean = np.mean(x)
-	var = ((x-mean)**2)
-	var = var.sum()/(N*(N-1))
+	x = np.asarray(x)
+	var = np.var(x, ddof=1)/x.size
 	return var
 
 def blocking(x ,k=10):
@@ -154,29 +153,56 @@ def blocking(x ,k=10):
 	variances_list : list
 		list of variances for each block
 	"""
-	x = np.array(x)
+	if njit is not None:
+		return list(_blocking_kernel(np.ascontiguousarray(x, dtype=np.float64), k))
+
+	# two buffers used in turn: each block is written over the older one
+	x = np.array(x, dtype=np.float64)
+	x_block = np.empty(len(x)//2)
+	N = len(x)
 
 	variances_list = []
 	for time in range(k):
-		N = int(len(x))
 		if N%2 != 0:
 			N = N-1
+		N = N//2
 
-		## index odd and even
-		index = np.arange(N)
-		odd = index[index%2==0]
-		even = index[index%2!=0]
-
-		# variance 
-		x1 = x[odd]
-		x2 = x[even]
-		x_block = (x1+x2)/2.0
-		var_block = variance(x_block)
+		# mean of odd and even elements
+		np.add(x[0:2*N:2], x[1:2*N:2], out=x_block[:N])
+		x_block[:N] *= 0.5
+		var_block = variance(x_block[:N])
 		variances_list.append(var_block)
-		x = x_block
+		x, x_block = x_block, x
 
 	return variances_list
 
+def _blocking_kernel(x, k):
+	"""
+	Compiled version of 'blocking': pairwise averages and variances
+	are computed in plain loops without index arrays.
+	"""
+	variances = np.empty(k)
+	for time in range(k):
+		N = x.size//2
+		x_block = np.empty(N)
+		for i in range(N):
+			x_block[i] = 0.5*(x[2*i]+x[2*i+1])
+
+		mean = 0.0
+		for i in range(N):
+			mean += x_block[i]
+		mean /= N
+		var = 0.0
+		for i in range(N):
+			var += (x_block[i]-mean)**2
+		variances[time] = var/(N*(N-1))
+		x = x_block
+
+	return variances
+
+if njit is not None:
+	_blocking_kernel = njit(cache=True, error_model='numpy')(_blocking_kernel)
+
 def standard_error_I(I, N_mean=10):
 	"""
 	Compute mean and standard error of recurrent current
@@ -185,24 +211,16 @@ def standard_error_I(I, N_mean=10):
 	N = len(I)
 	N_window = int(N/N_mean)
 
-	I_list, I_list_err = [], []
-	for i in range(N_mean):
-		start = i*N_window
-		stop = (i+1)*N_window
-		I_mean = I[start:stop]
-		I_list.append(I_mean.mean())
-		I_list_err.append(I_mean.std())
-
-	I_list = np.asanyarray(I_list)
-	I_list_err = np.asanyarray(I_list_err)
+	# one row for each of the N_mean consecutive windows
+	I_windows = I[:N_mean*N_window].reshape(N_mean, N_window)
+	I_list = I_windows.mean(axis=1)
+	I_list_err = I_windows.std(axis=1)
    
 
 	if N_mean < 30 : 
 		error = (I_list.max()-I_list.min())/2
 	else:
-		std_square = I_list_err*I_list_err
-		std_sum = std_square.sum(axis=0)
-		error = np.sqrt(std_sum)/std_square.shape[0]
+		error = np.sqrt(np.dot(I_list_err, I_list_err))/I_list_err.size
 	
 	return I_list.mean(), error
 
@@ -210,10 +228,48 @@ def errore_in_quadrature(std_array):
 	"""
 	fist index trial, second index number of indipendent measure
 	"""
-	std_square = std_array*std_array
-	std_sum = std_square.sum(axis=0)
+	std_sum = np.einsum('i...,i...->...', std_array, std_array)
 	return np.sqrt(std_sum)/std_array.shape[0]
 
+def decimate_trace(t, x, n=5000):
+	"""
+	Min/max envelope of a long time trace with about n points, roughly
+	the screen resolution, to speed up plotting. The trace is split in
+	buckets and the minimum and maximum of each bucket are kept in time
+	order, so that peaks are still drawn.
+
+	Parameters
+	----------
+	t : array
+		time array
+
+	x : array
+		time trace
+
+	n : integer (optional)
+		approximate number of points to keep. Default=5000
+
+	Returns
+	-------
+	t_dec : array
+		time of the kept points
+
+	x_dec : array
+		decimated time trace
+	"""
+	t = np.asarray(t)
+	x = np.asarray(x)
+	step = len(x)//max(1, n//2)
+	if step < 2:
+		return t, x
+
+	N = (len(x)//step)*step
+	buckets = x[:N].reshape(-1, step)
+	offset = np.arange(0, N, step)
+	index = np.column_stack([buckets.argmin(axis=1)+offset, buckets.argmax(axis=1)+offset])
+	index = np.concatenate([np.sort(index, axis=1).ravel(), np.arange(N, len(x))])
+	return t[index], x[index]
+
 
 
 if __name__ == '__main__':
@@ -227,37 +283,37 @@ if __name__ == '__main__':
     duration = np.load(f'{name}/duration.npy')*second
     rate_in = np.load(f'{name}/rate_in.npy')
 
-    t_exc = np.load(f'{name}/spikes_exc_mon.t.npy')
-    exc_neurons_i = np.load(f'{name}/spikes_exc_mon.i.npy')
-    t_inh = np.load(f'{name}/spikes_inh_mon.t.npy')
-    inh_neurons_i = np.load(f'{name}/spikes_inh_mon.i.npy')
-    t_astro = np.load(f'{name}/astro_mon.t.npy')
-    astro_i = np.load(f'{name}/astro_mon.i.npy')
-    mon_LFP = np.load(f'{name}/mon_LFP.LFP.npy')
-
-    t = np.load(f'{name}/var_astro_mon.t.npy')
-    Y_S = np.load(f'{name}/var_astro_mon.Y_S.npy')
-    Gamma_A =np.load(f'{name}/var_astro_mon.Gamma_A.npy')
-    I = np.load(f'{name}/var_astro_mon.I.npy')
-    C = np.load(f'{name}/var_astro_mon.C.npy')
-    h = np.load(f'{name}/var_astro_mon.h.npy')
-    x_A = np.load(f'{name}/var_astro_mon.x_A.npy')
-    G_A = np.load(f'{name}/var_astro_mon.G_A.npy')
+    t_exc = np.load(f'{name}/spikes_exc_mon.t.npy', mmap_mode='r')
+    exc_neurons_i = np.load(f'{name}/spikes_exc_mon.i.npy', mmap_mode='r')
+    t_inh = np.load(f'{name}/spikes_inh_mon.t.npy', mmap_mode='r')
+    inh_neurons_i = np.load(f'{name}/spikes_inh_mon.i.npy', mmap_mode='r')
+    t_astro = np.load(f'{name}/astro_mon.t.npy', mmap_mode='r')
+    astro_i = np.load(f'{name}/astro_mon.i.npy', mmap_mode='r')
+    mon_LFP = np.load(f'{name}/mon_LFP.LFP.npy', mmap_mode='r')
+
+    t = np.load(f'{name}/var_astro_mon.t.npy', mmap_mode='r')
+    Y_S = np.load(f'{name}/var_astro_mon.Y_S.npy', mmap_mode='r')
+    Gamma_A =np.load(f'{name}/var_astro_mon.Gamma_A.npy', mmap_mode='r')
+    I = np.load(f'{name}/var_astro_mon.I.npy', mmap_mode='r')
+    C = np.load(f'{name}/var_astro_mon.C.npy', mmap_mode='r')
+    h = np.load(f'{name}/var_astro_mon.h.npy', mmap_mode='r')
+    x_A = np.load(f'{name}/var_astro_mon.x_A.npy', mmap_mode='r')
+    G_A = np.load(f'{name}/var_astro_mon.G_A.npy', mmap_mode='r')
 
     #[:200] = excitatory , [200:] = inhibitory
-    mon_v = np.load(f'{name}/neurons_mon.v.npy')
+    mon_v = np.load(f'{name}/neurons_mon.v.npy', mmap_mode='r')
     # mon_g_e = np.load(f'{name}/neurons_mon.g_e.npy')
     # mon_g_i = np.load(f'{name}/neurons_mon.g_i.npy')
-    mon_t = np.load(f'{name}/neurons_mon.t.npy')
-    I_exc = np.load(f'{name}/neurons_mon.I_exc.npy')
-    I_inh = np.load(f'{name}/neurons_mon.I_inh.npy')
-    I_external = np.load(f'{name}/neurons_mon.I_syn_ext.npy')
-    firing_rate_exc_t = np.load(f'{name}/firing_rate_exc.t.npy')
-    firing_rate_exc = np.load(f'{name}/firing_rate_exc.rate.npy')
+    mon_t = np.load(f'{name}/neurons_mon.t.npy', mmap_mode='r')
+    I_exc = np.load(f'{name}/neurons_mon.I_exc.npy', mmap_mode='r')
+    I_inh = np.load(f'{name}/neurons_mon.I_inh.npy', mmap_mode='r')
+    I_external = np.load(f'{name}/neurons_mon.I_syn_ext.npy', mmap_mode='r')
+    firing_rate_exc_t = np.load(f'{name}/firing_rate_exc.t.npy', mmap_mode='r')
+    firing_rate_exc = np.load(f'{name}/firing_rate_exc.rate.npy', mmap_mode='r')
     # firing_rate_inh_t = np.load(f'{name}/firing_rate_inh.t.npy')
-    firing_rate_inh = np.load(f'{name}/firing_rate_inh.rate.npy')
+    firing_rate_inh = np.load(f'{name}/firing_rate_inh.rate.npy', mmap_mode='r')
     # firing_rate_t = np.load(f'{name}/firing_rate.t.npy')
-    firing_rate = np.load(f'{name}/firing_rate.rate.npy')
+    firing_rate = np.load(f'{name}/firing_rate.rate.npy', mmap_mode='r')
 
     N_e = 3200
     N_i = 800
@@ -271,43 +327,77 @@ if __name__ == '__main__':
     trans = transient(t*second, 50000)
 #     firing_rate_exc = smoothing_b(firing_rate_exc, width=1*ms)
 #     firing_rate_inh = smoothing_b(firing_rate_inh, width=1*ms)
-    LFP = mon_LFP.sum(axis=0)
+    # sum over recorded neurons, unless the file already stores the sum.
+    # Rows are accumulated in blocks to read the memory-mapped file once, in order
+    if mon_LFP.ndim == 1:
+        LFP = np.asarray(mon_LFP, dtype=np.float64)
+    else:
+        LFP = np.zeros(mon_LFP.shape[1], dtype=np.float64)
+        chunk = 64
+        for k in range(0, mon_LFP.shape[0], chunk):
+            LFP += mon_LFP[k:k+chunk].sum(axis=0)
+    # Unit conversions are done once on whole arrays, afterwards only plain
+    # ndarrays are used. Spike times, firing rates and LFP are stored in
+    # second, Hz and volt, so they are used as they are.
+    mon_t_s = np.asarray(mon_t/second)
+    # recurrent currents averaged over excitatory neurons, in pA
+    I_exc_mean_exc = np.asarray(I_exc[:200].mean(axis=0)/pA)
+    I_inh_mean_exc = np.asarray(I_inh[:200].mean(axis=0)/pA)
 
     # Network analysis concern mean values and spectral analysis of
     # population firing rate and LFP
     analysis = {'BASE': [0.5*second, 5*second],'GRE1': [7*second, 10*second], 'GRE2': [7*second, 10*second]}
 
+    # long time traces are decimated and simplified before rendering
+    plt.rc('path', simplify=True, simplify_threshold=1.0)
     fig4, ax4 = plt.subplots(nrows=2, ncols=1, sharex=True,
                             num='Firing rate and LFP ')
-    fr_t = firing_rate_exc_t[:]/second
+    fr_t = np.asarray(firing_rate_exc_t/second)
     fr_smooth = smoothing_b(firing_rate, width=5*ms)
-    ax4[0].plot(fr_t[50000:], fr_smooth[50000:], color='k', alpha=0.7)
+    fr_exc_smooth = smoothing_b(firing_rate_exc, width=1*ms)
+    fr_inh_smooth = smoothing_b(firing_rate_inh, width=1*ms)
+    ax4[0].plot(*decimate_trace(fr_t[50000:], fr_smooth[50000:]), color='k', alpha=0.7)
     ax4[0].grid(linestyle='dotted')
     ax4[0].set_xlabel('time (s)')
     ax4[0].set_ylabel('firing rate (Hz)')
     
 
-    ax4[1].plot(mon_t[5000:]/second, LFP[5000:], color='C5', alpha=0.7)
+    ax4[1].plot(*decimate_trace(mon_t_s[5000:], LFP[5000:]), color='C5', alpha=0.7)
     ax4[1].grid(linestyle='dotted')
     ax4[1].set_xlabel('time (s)')
     ax4[1].set_ylabel('LFP (?)')
     
+    # sampling frequency of the monitors, in Hz
+    fs = float(1/defaultclock.dt/Hz)
+    # selected windows of each zone, reused in the information blocks
+    windows = {}
     for zone in analysis.keys():
         fig3, ax3 = plt.subplots(nrows=1, ncols=2, figsize=(12,6),
                             num='Spectral analysis '+zone)
         
-        fr_exc = selected_window(firing_rate_exc, analysis[zone][0], analysis[zone][1], duration=duration)
-        fr_inh = selected_window(firing_rate_inh, analysis[zone][0], analysis[zone][1], duration=duration)
-        fr = selected_window(firing_rate, analysis[zone][0], analysis[zone][1], duration=duration)
-        LFP_w = selected_window(LFP, analysis[zone][0], analysis[zone][1], duration=duration)
+        start, stop = analysis[zone]
+        windows[zone] = {'fr_exc': selected_window(firing_rate_exc, start, stop, duration=duration),
+                         'fr_inh': selected_window(firing_rate_inh, start, stop, duration=duration),
+                         'fr': selected_window(firing_rate, start, stop, duration=duration),
+                         'fr_smooth': selected_window(fr_smooth, start, stop, duration=duration),
+                         'fr_exc_smooth': selected_window(fr_exc_smooth, start, stop, duration=duration),
+                         'fr_inh_smooth': selected_window(fr_inh_smooth, start, stop, duration=duration),
+                         'LFP': selected_window(LFP, start, stop, duration=duration),
+                         'I_exc': selected_window(I_exc_mean_exc, start, stop, duration=duration),
+                         'I_inh': selected_window(I_inh_mean_exc, start, stop, duration=duration)}
+        fr_exc = windows[zone]['fr_exc']
+        fr_inh = windows[zone]['fr_inh']
+        fr = windows[zone]['fr']
+        LFP_w = windows[zone]['LFP']
 
         N = len(fr_exc)
         NN = len(LFP_w)
 
-        freq_fr_exc, spectrum_fr_exc = signal.welch(fr_exc, fs=1/defaultclock.dt/Hz, nperseg=N//3)
-        freq_fr_inh, spectrum_fr_inh = signal.welch(fr_inh, fs=1/defaultclock.dt/Hz, nperseg=N//3)
-        freq_fr, spectrum_fr = signal.welch(fr, fs=1/defaultclock.dt/Hz, nperseg=N//3)
-        freq_LFP_w, spectrum_LFP_w = signal.welch(LFP_w, fs=1/defaultclock.dt/Hz, nperseg=NN//3)
+        # firing rates share the same length: one batched Welch along the last axis
+        freq_fr, spectra_fr = signal.welch(np.vstack([fr_exc, fr_inh, fr]), fs=fs, nperseg=N//3, axis=-1)
+        freq_fr_exc, freq_fr_inh = freq_fr, freq_fr
+        spectrum_fr_exc, spectrum_fr_inh, spectrum_fr = spectra_fr
+        freq_LFP_w, spectrum_LFP_w = signal.welch(LFP_w, fs=fs, nperseg=NN//3)
         print(len(freq_LFP_w))
 
         print(f' {zone} - time window: {analysis[zone][0]/second:.2f} - {analysis[zone][1]/second:.2f} s')
@@ -336,11 +426,11 @@ if __name__ == '__main__':
         ax3[1].grid(linestyle='dotted')
 
         # Underline selected zone
-        ax4[0].plot(selected_window(fr_t, analysis[zone][0], analysis[zone][1], duration=duration),
-                    selected_window(fr_smooth, analysis[zone][0], analysis[zone][1], duration=duration), color='C1')
+        ax4[0].plot(*decimate_trace(selected_window(fr_t, analysis[zone][0], analysis[zone][1], duration=duration),
+                                    windows[zone]['fr_smooth']), color='C1')
         
-        ax4[1].plot(selected_window(mon_t, analysis[zone][0], analysis[zone][1], duration=duration),
-                    LFP_w, color='C1')
+        ax4[1].plot(*decimate_trace(selected_window(mon_t_s, analysis[zone][0], analysis[zone][1], duration=duration),
+                                    LFP_w), color='C1')
         
     # Neurons firnig rate distribuction
     neuron_fr_BASE = neurons_firing(t_exc, exc_neurons_i, 
@@ -353,10 +443,10 @@ if __name__ == '__main__':
     # Mean firing rate and Recurrent current before and after GRE
     # before: trans- 2 second
     # after: 4 - 6.5 second
-    fr_exc_base = selected_window(firing_rate_exc, analysis['BASE'][0], analysis['BASE'][1], duration=duration)  
-    fr_inh_base = selected_window(firing_rate_inh, analysis['BASE'][0], analysis['BASE'][1], duration=duration)
-    fr_exc_gre1 = selected_window(firing_rate_exc, analysis['GRE1'][0], analysis['GRE1'][1], duration=duration)  
-    fr_inh_gre1 = selected_window(firing_rate_inh, analysis['GRE1'][0], analysis['GRE1'][1], duration=duration)
+    fr_exc_base = windows['BASE']['fr_exc']
+    fr_inh_base = windows['BASE']['fr_inh']
+    fr_exc_gre1 = windows['GRE1']['fr_exc']
+    fr_inh_gre1 = windows['GRE1']['fr_inh']
 
     I_exc_base = selected_window(I_exc[0], 1.2*second, 5.5*second, duration=duration)
    
@@ -365,8 +455,8 @@ if __name__ == '__main__':
     
     print('')
     print('EXTERNAL AND RECURRENT CURRENTS')
-    I_external_exc = I_external[:200].mean(axis=0)
-    I_external_inh = I_external[200:].mean(axis=0)
+    I_external_exc = np.asarray(I_external[:200].mean(axis=0)/pA)
+    I_external_inh = np.asarray(I_external[200:].mean(axis=0)/pA)
     I_external_exc_err = np.sqrt(blocking(I_external_exc, k=12)[-1])
     I_external_inh_err = np.sqrt(blocking(I_external_inh, k=12)[-1])
 
@@ -378,16 +468,16 @@ if __name__ == '__main__':
     # plt.show()
     I_external_exc_1, I_external_exc_1_err = standard_error_I(I_external_exc, N_mean=35)
     I_external_inh_1, I_external_inh_1_err = standard_error_I(I_external_inh, N_mean=35)
-    print(f'I_external on exc 1: {I_external_exc_1/pA:.4f} +- {I_external_exc.std(ddof=1)/pA:.4f} pA')
-    print(f'I_external on inh 1: {I_external_inh_1/pA:.4f} +- {I_external_inh.std(ddof=1)/pA:.4f} pA')
-    print(f'I_external on exc: {I_external_exc.mean()/pA:.4f} +- {I_external_exc_err/pA:.4f} pA')
-    print(f'I_external on inh: {I_external_inh.mean()/pA:.4f} +- {I_external_inh_err/pA:.4f} pA')
+    print(f'I_external on exc 1: {I_external_exc_1:.4f} +- {I_external_exc.std(ddof=1):.4f} pA')
+    print(f'I_external on inh 1: {I_external_inh_1:.4f} +- {I_external_inh.std(ddof=1):.4f} pA')
+    print(f'I_external on exc: {I_external_exc.mean():.4f} +- {I_external_exc_err:.4f} pA')
+    print(f'I_external on inh: {I_external_inh.mean():.4f} +- {I_external_inh_err:.4f} pA')
     for zone in analysis.keys():
         print(zone)
-        I_exc_zone = selected_window(I_exc[:200].mean(axis=0), analysis[zone][0], analysis[zone][1], duration=duration)
-        I_inh_zone = selected_window(I_inh[:200].mean(axis=0), analysis[zone][0], analysis[zone][1], duration=duration)
-        I_exc_zone_err = np.sqrt(blocking(I_exc_zone/pA, k=10)[-1])*pA
-        I_inh_zone_err = np.sqrt(blocking(I_inh_zone/pA, k=10)[-1])*pA
+        I_exc_zone = windows[zone]['I_exc']
+        I_inh_zone = windows[zone]['I_inh']
+        I_exc_zone_err = np.sqrt(blocking(I_exc_zone, k=10)[-1])
+        I_inh_zone_err = np.sqrt(blocking(I_inh_zone, k=10)[-1])
         I_exc_zone_err = np.std(I_exc_zone, ddof=1)
         I_inh_zone_err = np.std(I_inh_zone, ddof=1)
 
@@ -399,23 +489,20 @@ if __name__ == '__main__':
         # plt.legend()
 
         plt.figure()
-        plt.plot(I_exc_zone/pA, label=zone)
+        plt.plot(I_exc_zone, label=zone)
         plt.legend()
-        print(f'I_exc : {I_exc_zone.mean()/pA:.4f} +- {I_exc_zone.std()/pA:.4f} pA')
-        print(f'I_inh : {I_inh_zone.mean()/pA:.4f} pA +- {I_inh_zone.std()/pA:.4f} pA')
+        print(f'I_exc : {I_exc_zone.mean():.4f} +- {I_exc_zone.std():.4f} pA')
+        print(f'I_inh : {I_inh_zone.mean():.4f} pA +- {I_inh_zone.std():.4f} pA')
     print('')
     print('FIRING RATE')
     for zone in analysis.keys():
         print(zone)
-        fr_smooth_zone = selected_window(fr_smooth, analysis[zone][0], analysis[zone][1])  
-        fr_exc_zone = selected_window(firing_rate_exc, analysis[zone][0], analysis[zone][1])  
-        fr_inh_zone = selected_window(firing_rate_inh, analysis[zone][0], analysis[zone][1])
-
-        fr_exc_zone = smoothing_b(fr_exc_zone, width=1*ms)
-        fr_inh_zone = smoothing_b(fr_inh_zone, width=1*ms)
+        fr_smooth_zone = windows[zone]['fr_smooth']
+        fr_exc_zone = windows[zone]['fr_exc_smooth']
+        fr_inh_zone = windows[zone]['fr_inh_smooth']
         
 
-        fr_exc_zone_err = np.sqrt(blocking(fr_smooth_zone/Hz, k=12)[-1])*Hz
+        fr_exc_zone_err = np.sqrt(blocking(fr_smooth_zone, k=12)[-1])
         fr_exc_zone_err = np.std(fr_smooth_zone, ddof=1)
         
         # plt.figure(num='firing rate')
@@ -424,15 +511,15 @@ if __name__ == '__main__':
         # plt.legend()
         # plt.show()
 
-        print(f'fr : {fr_smooth_zone.mean()/Hz:.4f} +- {fr_smooth_zone.std(ddof=1)/Hz:.4f} Hz')
-        print(f'fr_exc : {fr_exc_zone.mean()/Hz:.4f} +- {fr_exc_zone.std(ddof=1)/Hz:.4f} Hz')
-        print(f'fr_inh : {fr_inh_zone.mean()/Hz:.4f} +- {fr_inh_zone.std(ddof=1)/Hz:.4f} Hz')
+        print(f'fr : {fr_smooth_zone.mean():.4f} +- {fr_smooth_zone.std(ddof=1):.4f} Hz')
+        print(f'fr_exc : {fr_exc_zone.mean():.4f} +- {fr_exc_zone.std(ddof=1):.4f} Hz')
+        print(f'fr_inh : {fr_inh_zone.mean():.4f} +- {fr_inh_zone.std(ddof=1):.4f} Hz')
     print('')
     print('LFP')
     for zone in analysis.keys():
         print(zone)
-        LFP_zone = selected_window(LFP, analysis[zone][0], analysis[zone][1])  
-        print(f'LFP : {LFP_zone.mean()/volt:.4f} +- {LFP_zone.std()/volt:.4f} V')
+        LFP_zone = windows[zone]['LFP']
+        print(f'LFP : {LFP_zone.mean():.4f} +- {LFP_zone.std():.4f} V')
 
     print(f'Astro activation: {t_astro.mean()} +- {t_astro.std()}')
         
@@ -443,22 +530,25 @@ if __name__ == '__main__':
     fig1, ax1 = plt.subplots(nrows=3, ncols=1, sharex=True, gridspec_kw={'height_ratios': [2.5,1,1]},
                             figsize=(12, 14), num=f'Raster plot')
     step = 10
-    ax1[0].plot(t_exc[exc_neurons_i%step==0]/second, 
-            exc_neurons_i[exc_neurons_i%step==0], '|', color='C3')
-    ax1[0].plot(t_inh[inh_neurons_i%step==0]/second, 
-            inh_neurons_i[inh_neurons_i%step==0]+N_e, '|', color='C0',)
-    ax1[0].plot(t_astro[astro_i%step==0]/second, 
-            astro_i[astro_i%step==0]+(N_e+N_i),'|' , color='green')
+    exc_step = exc_neurons_i%step==0
+    inh_step = inh_neurons_i%step==0
+    astro_step = astro_i%step==0
+    ax1[0].scatter(t_exc[exc_step], 
+            exc_neurons_i[exc_step], marker='|', s=36, linewidths=1, color='C3')
+    ax1[0].scatter(t_inh[inh_step], 
+            inh_neurons_i[inh_step]+N_e, marker='|', s=36, linewidths=1, color='C0')
+    ax1[0].scatter(t_astro[astro_step], 
+            astro_i[astro_step]+(N_e+N_i), marker='|', s=36, linewidths=1, color='green')
     ax1[0].set_ylabel('cell index')
 
 #     firing_rate_exc = smoothing_b(firing_rate_exc, width=1*ms)
 #     firing_rate_inh = smoothing_b(firing_rate_inh, width=1*ms)
    
-    ax1[1].plot(firing_rate_exc_t[trans:]/second, firing_rate_exc[trans:]/Hz, color='C3')
+    ax1[1].plot(*decimate_trace(fr_t[trans:], firing_rate_exc[trans:]), color='C3')
     ax1[1].set_ylabel('FR_exc (Hz)')
     ax1[1].grid(linestyle='dotted')
 
-    ax1[2].plot(firing_rate_exc_t[trans:]/second, firing_rate_inh[trans:]/Hz, color='C0')
+    ax1[2].plot(*decimate_trace(fr_t[trans:], firing_rate_inh[trans:]), color='C0')
     ax1[2].set_ylabel('FR_inh (Hz)')
     ax1[2].set_xlabel('time (s)')
     ax1[2].grid(linestyle='dotted')
@@ -478,11 +568,11 @@ if __name__ == '__main__':
     ax2[0].set_ylabel('GRE')
     ax2[0].set_ylim([-0.5,0.5])
 
-    ax2[1].plot(mon_t[trans:]/second, I_exc[:200].mean(axis=0)[trans:]/pA, color='C3')
+    ax2[1].plot(*decimate_trace(mon_t_s[trans:], I_exc_mean_exc[trans:]), color='C3')
     ax2[1].set_ylabel(r'$I_{exc}^{rec}$ ($\rm{pA}$)')
     ax2[1].grid(linestyle='dotted')
 
-    ax2[2].plot(mon_t[trans:]/second, I_inh[:200].mean(axis=0)[trans:]/pA, color='C0')
+    ax2[2].plot(*decimate_trace(mon_t_s[trans:], I_inh_mean_exc[trans:]), color='C0')
     ax2[2].set_ylabel(r'$I_{inh}^{rec}$ ($\rm{pA}$)')
     ax2[2].grid(linestyle='dotted')
     ax2[2].set_xlabel('time (s)')